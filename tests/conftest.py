@@ -0,0 +1,5 @@
+import os
+import sys
+
+# utils/ is a plain directory of scripts; make `import utils.<module>` work
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
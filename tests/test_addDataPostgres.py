@@ -0,0 +1,54 @@
+import openpyxl
+import pytest
+
+from utils.addDataPostgres import CampaignDataUploader
+
+
+def make_uploader(tmp_path, rows):
+    path = tmp_path / "campaign.xlsx"
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    # Columns deliberately out of order relative to CampaignDataUploader.COLUMNS
+    ws.append(list(reversed(CampaignDataUploader.COLUMNS)))
+    for row in rows:
+        ws.append(list(reversed(row)))
+    wb.save(path)
+    return CampaignDataUploader({}, str(path))
+
+
+def sheet_row(i):
+    return tuple(f"{col}-{i}" for col in CampaignDataUploader.COLUMNS)
+
+
+def test_iter_excel_rows_orders_columns_and_skips_blank_rows(tmp_path):
+    blank = (None,) * len(CampaignDataUploader.COLUMNS)
+    uploader = make_uploader(tmp_path, [sheet_row(0), blank, sheet_row(1)])
+
+    assert list(uploader.iter_excel_rows()) == [sheet_row(0), sheet_row(1)]
+
+
+def test_iter_chunks_boundaries(tmp_path):
+    uploader = make_uploader(tmp_path, [sheet_row(i) for i in range(5)])
+
+    chunks = list(uploader.iter_chunks(chunksize=2))
+
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert [row for chunk in chunks for row in chunk] == [sheet_row(i) for i in range(5)]
+
+
+def test_iter_chunks_exact_multiple_and_empty(tmp_path):
+    uploader = make_uploader(tmp_path, [sheet_row(i) for i in range(4)])
+    assert [len(chunk) for chunk in uploader.iter_chunks(chunksize=2)] == [2, 2]
+
+    empty = make_uploader(tmp_path, [])
+    assert list(empty.iter_chunks(chunksize=2)) == []
+
+
+def test_iter_excel_rows_names_missing_columns(tmp_path):
+    path = tmp_path / "partial.xlsx"
+    wb = openpyxl.Workbook()
+    wb.active.append([col for col in CampaignDataUploader.COLUMNS if col not in ("company_name", "query")])
+    wb.save(path)
+
+    with pytest.raises(ValueError, match="query, company_name"):
+        list(CampaignDataUploader({}, str(path)).iter_excel_rows())
@@ -0,0 +1,250 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pytest
+
+from utils.texttosql import _SQL_GUARD_RE, TextToSQLGenerator
+
+
+@pytest.fixture
+def generator():
+    # Bypass __init__: these helpers need neither a database nor an API key
+    gen = TextToSQLGenerator.__new__(TextToSQLGenerator)
+    gen._sql_cache = OrderedDict()
+    gen._sql_cache_size = 3
+    return gen
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("SELECT 1", "SELECT 1;"),
+    ("SELECT 1;", "SELECT 1;"),
+    ("```sql\nSELECT *\nFROM campaign_data;\n```", "SELECT * FROM campaign_data;"),
+    ("```SQL\nSELECT 1\n```", "SELECT 1;"),
+    ("```SELECT 1```", "SELECT 1;"),
+    ("-- people count\nSELECT COUNT(*)\n# note\nFROM campaign_data", "SELECT COUNT(*) FROM campaign_data;"),
+    ("  SELECT *\n\n    FROM campaign_data\n  ", "SELECT * FROM campaign_data;"),
+    ("SELECT * FROM campaign_data WHERE company_name = 'a  b';", "SELECT * FROM campaign_data WHERE company_name = 'a  b';"),
+])
+def test_clean_sql_query(generator, raw, expected):
+    assert generator._clean_sql_query(raw) == expected
+
+
+def test_remember_query_evicts_least_recently_used(generator):
+    generator._remember_query("a", "SELECT 1;")
+    generator._remember_query("b", "SELECT 2;")
+    generator._remember_query("c", "SELECT 3;")
+
+    # A hit refreshes "a", so "b" is now the oldest entry
+    assert generator._recall_query("a") == "SELECT 1;"
+    generator._remember_query("d", "SELECT 4;")
+
+    assert list(generator._sql_cache) == ["c", "a", "d"]
+    assert generator._recall_query("b") is None
+
+
+def test_remember_query_overwrites_existing_entry(generator):
+    generator._remember_query("a", "SELECT 1;")
+    generator._remember_query("a", "SELECT 2;")
+
+    assert len(generator._sql_cache) == 1
+    assert generator._recall_query("a") == "SELECT 2;"
+
+
+@pytest.mark.parametrize("sql_query", [
+    "SELECT COUNT(*) FROM campaign_data;",
+    "select * from campaign_data ;  ",
+    "WITH c AS (SELECT company_name FROM campaign_data) SELECT * FROM c;",
+    "SELECT * FROM campaign_data WHERE company_name ILIKE '%;%';",
+    "SELECT * FROM campaign_data WHERE person_headline = 'it''s; fine';",
+])
+def test_sql_guard_accepts_single_select(sql_query):
+    assert _SQL_GUARD_RE.match(sql_query)
+
+
+@pytest.mark.parametrize("sql_query", [
+    "DELETE FROM campaign_data;",
+    "UPDATE campaign_data SET query = NULL;",
+    "SELECT 1; DROP TABLE campaign_data;",
+    "SELECT 1",
+    "SELECT ';",
+    "SELECTION;",
+])
+def test_sql_guard_rejects_other_statements(sql_query):
+    assert not _SQL_GUARD_RE.match(sql_query)
+
+
+def test_iter_query_rejects_before_connecting(generator):
+    generator.conn = None
+    with pytest.raises(ValueError):
+        next(generator.iter_query("DELETE FROM campaign_data;"))
+    assert generator.conn is None
+
+
+def unit(i, dim=4):
+    vector = np.zeros(dim, dtype=np.float32)
+    vector[i % dim] = 1.0
+    return vector
+
+
+@pytest.fixture
+def semantic_generator(generator):
+    generator.semantic_cache_threshold = 0.95
+    generator.semantic_cache_path = None
+    generator._semantic_cache_size = 3
+    generator._cache_questions = []
+    generator._cache_queries = []
+    generator._cache_vectors = None
+    generator._cache_next = 0
+    return generator
+
+
+def test_semantic_cache_ring_buffer_overwrites_oldest(semantic_generator):
+    gen = semantic_generator
+    for i in range(5):
+        gen._semantic_store(f"q{i}", unit(i), f"SELECT {i};")
+
+    # Capacity 3: slots hold q3, q4, q2 and the next write replaces q2
+    assert gen._cache_vectors.shape == (3, 4)
+    assert gen._cache_queries == ["SELECT 3;", "SELECT 4;", "SELECT 2;"]
+    assert gen._cache_next == 2
+    # unit(4) == unit(0): the newest entry wins, the evicted q0/q1 are gone
+    assert gen._semantic_lookup(unit(0)) == "SELECT 4;"
+    assert gen._semantic_lookup(unit(1)) is None
+
+
+def test_semantic_cache_threshold(semantic_generator):
+    gen = semantic_generator
+    gen._semantic_store("q", unit(0), "SELECT 1;")
+
+    close = np.array([1.0, 0.1, 0.0, 0.0], dtype=np.float32)
+    far = np.array([1.0, 1.0, 0.0, 0.0], dtype=np.float32)
+    assert gen._semantic_lookup(close / np.linalg.norm(close)) == "SELECT 1;"
+    assert gen._semantic_lookup(far / np.linalg.norm(far)) is None
+
+
+def test_semantic_cache_save_load_round_trip(semantic_generator, tmp_path):
+    gen = semantic_generator
+    gen.semantic_cache_path = str(tmp_path / "cache")
+    for i in range(4):
+        gen._semantic_store(f"q{i}", unit(i), f"SELECT {i};")
+    gen._save_semantic_cache()
+
+    assert (tmp_path / "cache.npy").exists()
+    assert (tmp_path / "cache.json").exists()
+
+    loaded = TextToSQLGenerator.__new__(TextToSQLGenerator)
+    loaded.semantic_cache_threshold = 0.95
+    loaded.semantic_cache_path = gen.semantic_cache_path
+    loaded._semantic_cache_size = 3
+    loaded._cache_questions = []
+    loaded._cache_queries = []
+    loaded._cache_vectors = None
+    loaded._cache_next = 0
+    loaded._load_semantic_cache()
+
+    assert loaded._cache_questions == gen._cache_questions
+    assert loaded._cache_queries == gen._cache_queries
+    assert loaded._cache_next == gen._cache_next
+    np.testing.assert_array_equal(loaded._cache_vectors, gen._cache_vectors)
+    assert loaded._semantic_lookup(unit(3)) == "SELECT 3;"
+
+    # Writes continue in ring order after a reload
+    loaded._semantic_store("q4", unit(0), "SELECT 4;")
+    assert loaded._cache_queries == ["SELECT 3;", "SELECT 4;", "SELECT 2;"]
+
+
+class StubLLM:
+    """Async LLM stand-in; later questions answer sooner to shuffle completion order"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def ainvoke(self, prompt):
+        self.calls.append(prompt)
+        await asyncio.sleep(0.05 / len(self.calls))
+        return f"```sql\nSELECT '{prompt}'\n```"
+
+
+@pytest.fixture
+def async_generator(generator):
+    generator.embeddings = None
+    generator.semantic_cache_threshold = None
+    generator.schema_top_k = None
+    generator._cache_queries = []
+    generator._db_lock = None
+    generator._db_lock_loop = None
+    generator.llm = StubLLM()
+    generator._build_prompt = lambda question, vector: question
+
+    main_thread = threading.get_ident()
+    generator.cache_threads = []
+    generator.query_threads = []
+    remember = generator._remember_query
+
+    def remember_query(question, sql_query):
+        generator.cache_threads.append(threading.get_ident())
+        remember(question, sql_query)
+
+    def run_query(sql_query, limit=None):
+        generator.query_threads.append(threading.get_ident())
+        return [{"sql": sql_query}], None
+
+    generator._remember_query = remember_query
+    generator._run_query = run_query
+    generator.main_thread = main_thread
+    return generator
+
+
+def test_generate_sql_query_async_cleans_and_caches(async_generator):
+    gen = async_generator
+
+    assert asyncio.run(gen.generate_sql_query_async(" a ")) == "SELECT 'a';"
+    # The second call is served from the exact-match cache
+    assert asyncio.run(gen.generate_sql_query_async("a")) == "SELECT 'a';"
+    assert gen.llm.calls == ["a"]
+
+
+def test_query_many_async_keeps_order_and_thread_roles(async_generator):
+    gen = async_generator
+    questions = ["a", "b", "c"]
+
+    results = asyncio.run(gen.query_many_async(questions))
+
+    assert [r["question"] for r in results] == questions
+    assert [r["sql_query"] for r in results] == ["SELECT 'a';", "SELECT 'b';", "SELECT 'c';"]
+    assert all(r["error"] is None and r["num_results"] == 1 for r in results)
+    # Caches are only touched on the event-loop thread, queries run off it
+    assert gen.cache_threads == [gen.main_thread] * 3
+    assert gen.query_threads and gen.main_thread not in gen.query_threads
+
+
+def test_query_many_async_survives_repeated_asyncio_run(async_generator):
+    gen = async_generator
+
+    def slow_run_query(sql_query, limit=None):
+        # Long enough that later queries wait on the lock
+        time.sleep(0.02)
+        return [], None
+
+    gen._run_query = slow_run_query
+    for batch in (["a", "b", "c"], ["d", "e", "f"]):
+        results = asyncio.run(gen.query_many_async(batch))
+        assert [r["question"] for r in results] == batch
+        assert all(r["error"] is None for r in results)
+
+
+def test_query_from_text_async_reports_generation_failure(async_generator):
+    gen = async_generator
+
+    async def fail(question):
+        return None
+
+    gen.generate_sql_query_async = fail
+    result = asyncio.run(gen.query_from_text_async("a"))
+
+    assert result["sql_query"] is None
+    assert result["error"] == "Failed to generate SQL query"
+    assert gen.query_threads == []
@@ -1,24 +1,70 @@
-import pandas as pd
+import functools
+import itertools
+import tempfile
+
+import openpyxl
 import psycopg2
+from pgcopy import CopyManager
+from psycopg2.extras import execute_values
+
+def _is_null(v):
+    # NaN (and NaT) are the only values not equal to themselves
+    if v is None:
+        return True
+    try:
+        return bool(v != v)
+    except TypeError:
+        # pd.NA: comparisons return NA, whose truth value is ambiguous
+        return True
+
 
 class CampaignDataUploader:
-    def __init__(self, db_config, excel_path):
+    COLUMNS = (
+        'query', 'person_first_name', 'person_last_name', 'person_headline',
+        'person_business_email', 'person_personal_email', 'person_linkedin_url',
+        'company_name', 'company_size', 'company_type', 'company_country',
+        'company_industry', 'company_linkedin_url', 'company_meta_title',
+        'company_meta_description', 'company_meta_keywords'
+    )
+    # Bytes of binary COPY data buffered in memory before spilling to disk
+    SPOOL_SIZE = 64 * 1024 * 1024
+    # Rows per multi-row INSERT in the execute_values fallback
+    PAGE_SIZE = 5000
+
+    def __init__(self, db_config, excel_path, use_copy=True, pool=None):
         self.db_config = db_config
         self.excel_path = excel_path
+        # Optional psycopg2 pool shared with the rest of a service; without it
+        # a dedicated connection is opened for the upload
+        self.pool = pool
+        # COPY is the fast path; fall back to multi-row INSERTs when the
+        # table relies on rules (which COPY does not fire)
+        self.use_copy = use_copy
         self.conn = None
         self.cursor = None
+        self._copy_manager = None
 
     def connect(self):
-        self.conn = psycopg2.connect(**self.db_config)
+        if self.pool:
+            self.conn = self.pool.getconn()
+        else:
+            self.conn = psycopg2.connect(**self.db_config)
         self.cursor = self.conn.cursor()
+        # The COPY manager caches column types per session
+        self._copy_manager = None
 
     def close(self):
         if self.cursor:
             self.cursor.close()
+            self.cursor = None
         if self.conn:
-            self.conn.close()
+            if self.pool:
+                self.pool.putconn(self.conn)
+            else:
+                self.conn.close()
+            self.conn = None
 
-    def create_table(self):
+    def create_table(self, commit=True):
         create_table_query = """
         CREATE TABLE IF NOT EXISTS campaign_data (
             query TEXT,
@@ -40,13 +86,79 @@ class CampaignDataUploader:
         );
         """
         self.cursor.execute(create_table_query)
-        self.conn.commit()
+        if commit:
+            self.conn.commit()
+
+    def iter_excel_rows(self):
+        # read_only streams the sheet instead of loading the whole workbook
+        wb = openpyxl.load_workbook(self.excel_path, read_only=True, data_only=True)
+        try:
+            rows = wb.active.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            missing = [col for col in self.COLUMNS if col not in header]
+            if missing:
+                raise ValueError(f"Sheet is missing columns: {', '.join(missing)}")
+            positions = [header.index(col) for col in self.COLUMNS]
+            for row in rows:
+                if all(v is None for v in row):
+                    continue
+                yield tuple(row[i] if i < len(row) else None for i in positions)
+        finally:
+            wb.close()
+
+    def iter_chunks(self, chunksize=10_000):
+        # Bounded batches of sheet rows; each one becomes a single COPY
+        rows = self.iter_excel_rows()
+        while True:
+            chunk = list(itertools.islice(rows, chunksize))
+            if not chunk:
+                return
+            yield chunk
 
-    def load_data_from_excel(self):
-        df = pd.read_excel(self.excel_path)
-        return df
+    def insert_data(self, df, commit=True):
+        # Align column order with the column lists below once, up front
+        df = df[list(self.COLUMNS)]
 
-    def insert_data(self, df):
+        self.begin_bulk_load()
+
+        # Convert NaN/NaT/NA to None (for SQL NULL) row by row, which avoids
+        # materialising a second object-dtype copy of the frame
+        self.insert_rows(
+            tuple(None if _is_null(v) else v for v in row)
+            for row in df.itertuples(index=False, name=None)
+        )
+        if commit:
+            self.conn.commit()
+
+    def begin_bulk_load(self):
+        # Skip the WAL fsync wait for the current transaction only
+        self.cursor.execute("SET LOCAL synchronous_commit = OFF")
+
+    def insert_rows(self, rows):
+        # rows: iterable of tuples in COLUMNS order, None for SQL NULL.
+        # Nothing is committed here; the caller owns the transaction.
+        if self.use_copy:
+            self._copy_rows(rows)
+        else:
+            self._insert_values(rows)
+
+    def _copy_rows(self, rows):
+        # Binary COPY: no CSV escaping here and no text parsing on the server.
+        # The manager looks up column types once per connection.
+        if self._copy_manager is None:
+            self._copy_manager = CopyManager(self.conn, 'campaign_data', self.COLUMNS)
+
+        # Every column is TEXT; None stays None (SQL NULL). pgcopy serialises
+        # the whole batch first: keep it in memory (chunks are bounded by
+        # iter_chunks) and only spill to disk for unusually large batches.
+        self._copy_manager.copy(
+            (tuple(None if v is None else str(v) for v in row) for row in rows),
+            functools.partial(tempfile.SpooledTemporaryFile, max_size=self.SPOOL_SIZE)
+        )
+
+    def _insert_values(self, rows):
         insert_query = """
         INSERT INTO campaign_data (
             query, person_first_name, person_last_name, person_headline,
@@ -54,30 +166,21 @@ class CampaignDataUploader:
             company_name, company_size, company_type, company_country,
             company_industry, company_linkedin_url, company_meta_title,
             company_meta_description, company_meta_keywords
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        ) VALUES %s
         """
 
-        # Convert NaN to None (for SQL NULL) to avoid formatting issues
-        df = df.where(pd.notnull(df), None)
-
-        for _, row in df.iterrows():
-            values = (
-                row['query'], row['person_first_name'], row['person_last_name'], row['person_headline'],
-                row['person_business_email'], row['person_personal_email'], row['person_linkedin_url'],
-                row['company_name'], row['company_size'], row['company_type'], row['company_country'],
-                row['company_industry'], row['company_linkedin_url'], row['company_meta_title'],
-                row['company_meta_description'], row['company_meta_keywords']
-            )
-            self.cursor.execute(insert_query, values)
-
-        self.conn.commit()
+        # Rows are consumed lazily, one multi-row INSERT per page
+        execute_values(self.cursor, insert_query, rows, page_size=self.PAGE_SIZE)
 
     def run(self):
         try:
             self.connect()
-            self.create_table()
-            df = self.load_data_from_excel()
-            self.insert_data(df)
+            # Table creation and the bulk load land in a single transaction
+            self.create_table(commit=False)
+            self.begin_bulk_load()
+            for chunk in self.iter_chunks():
+                self.insert_rows(chunk)
+            self.conn.commit()
             print("✅ Data inserted successfully.")
         except Exception as e:
             print("❌ Error:", e)
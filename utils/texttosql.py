@@ -1,36 +1,119 @@
-import pandas as pd
+from __future__ import annotations
+
 import psycopg2
-from langchain_google_genai import GoogleGenerativeAI
+from psycopg2.extras import RealDictCursor
+from psycopg2.pool import ThreadedConnectionPool
+from langchain_google_genai import GoogleGenerativeAI, GoogleGenerativeAIEmbeddings
 from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
-from langchain.schema import OutputParserException
+import asyncio
 import os
-from typing import List, Dict, Any
+import itertools
+import json
+from collections import OrderedDict
+import uuid
+from typing import TYPE_CHECKING, List, Dict, Any, Iterator, Optional, Tuple
 import re
+import textwrap
+
+if TYPE_CHECKING:
+    # numpy is only needed by the opt-in semantic cache and schema top-k,
+    # so it is imported lazily where those run
+    import numpy as np
+
+# Markdown code fences around the generated query
+_FENCE_RE = re.compile(r"^\s*```(?:sql)?|```\s*$", re.MULTILINE | re.IGNORECASE)
+# Whole-line comments or explanatory notes
+_COMMENT_RE = re.compile(r"^\s*(?:#|--).*$", re.MULTILINE)
+# Line breaks plus surrounding indentation, collapsed to a single space
+_LINE_BREAK_RE = re.compile(r"\s*\n\s*")
+# Cheap pre-filter: a single statement starting with SELECT/WITH whose only
+# semicolon outside string literals is the terminating one. It does not make
+# a query read-only; the read-only session in connect_db() does that.
+_SQL_GUARD_RE = re.compile(
+    r"^\s*(?:SELECT|WITH)\b(?:[^;']|'[^']*')*;\s*$", re.IGNORECASE | re.DOTALL
+)
 
 class TextToSQLGenerator:
-    def __init__(self, db_config: Dict[str, str], google_api_key: str):
+    def __init__(
+        self,
+        db_config: Dict[str, str],
+        google_api_key: str,
+        semantic_cache_threshold: Optional[float] = None,
+        semantic_cache_path: Optional[str] = None,
+        schema_top_k: Optional[int] = None,
+        pool: Optional[ThreadedConnectionPool] = None
+    ):
         """
         Initialize the Text-to-SQL generator with database config and Google API key
         
         Args:
             db_config: Database connection configuration
             google_api_key: Google Gemini API key
+            semantic_cache_threshold: Minimum cosine similarity for a previously
+                answered question to be reused (e.g. 0.95); None (the default)
+                disables the semantic cache
+            semantic_cache_path: Optional path prefix the semantic cache is
+                loaded from and saved to on close_db(), as <path>.npy
+                (embeddings) and <path>.json (questions and SQL)
+            schema_top_k: If set, only the columns most relevant to each
+                question are included in the prompt; None sends the full schema
+            pool: Optional connection pool shared with the rest of a service;
+                without it a private pool is created on the first connect_db()
         """
         self.db_config = db_config
         self.conn = None
-        self.cursor = None
         
-        # Initialize Google Gemini LLM
-        os.environ["GOOGLE_API_KEY"] = google_api_key
+        # Warm connections shared by connect_db()/close_db() cycles, so each
+        # session skips the TCP/TLS/auth handshake. An injected pool belongs
+        # to the caller; a private one is only opened when first needed.
+        self._pool = pool
+        self._owns_pool = pool is None
+        # Serializes async callers on the single connection. An asyncio.Lock
+        # belongs to one event loop, so a new one is made per running loop
+        # (e.g. each asyncio.run() call)
+        self._db_lock: Optional[asyncio.Lock] = None
+        self._db_lock_loop: Optional[asyncio.AbstractEventLoop] = None
+        
+        # Initialize Google Gemini LLM; the key is passed explicitly rather than
+        # through the process-wide GOOGLE_API_KEY environment variable
         self.llm = GoogleGenerativeAI(
             model="gemini-1.5-flash",
             temperature=0.1,
             google_api_key=google_api_key
         )
         
+        # Exact-match LRU cache of question -> SQL, checked before anything else
+        self._sql_cache: "OrderedDict[str, str]" = OrderedDict()
+        self._sql_cache_size = 1024
+        
+        # Semantic cache: normalized question embeddings and the SQL generated
+        # for them, so near-duplicate questions skip the LLM call entirely
+        self.semantic_cache_threshold = semantic_cache_threshold
+        self.semantic_cache_path = semantic_cache_path
+        # The embeddings client is only needed by the semantic cache and the
+        # schema top-k retrieval, both of which are off by default
+        self.embeddings = None
+        if semantic_cache_threshold is not None or schema_top_k:
+            self.embeddings = GoogleGenerativeAIEmbeddings(
+                model="models/embedding-001",
+                google_api_key=google_api_key
+            )
+        # Fixed-capacity ring buffer: the embedding matrix is allocated once and
+        # the oldest entry is overwritten when it is full
+        self._semantic_cache_size = 1024
+        self._cache_questions: List[str] = []
+        self._cache_queries: List[Optional[str]] = []
+        self._cache_vectors: Optional[np.ndarray] = None
+        self._cache_next = 0
+        if (
+            semantic_cache_path
+            and os.path.exists(f"{semantic_cache_path}.npy")
+            and os.path.exists(f"{semantic_cache_path}.json")
+        ):
+            self._load_semantic_cache()
+        
         # Define the database schema
-        self.schema_info = """
+        self.schema_info = textwrap.dedent("""
         Table: campaign_data
         Columns:
         - query (TEXT): Search query used
@@ -49,20 +132,34 @@ class TextToSQLGenerator:
         - company_meta_title (TEXT): Company meta title
         - company_meta_description (TEXT): Company meta description
         - company_meta_keywords (TEXT): Company meta keywords
-        """
+        """).strip()
         
-        # Create the prompt template
-        self.prompt_template = PromptTemplate(
-            input_variables=["schema", "question"],
-            template="""
-            You are a PostgreSQL expert. Given the following database schema and a natural language question, 
+        # Optional retrieval over per-column schema descriptions. Trades the
+        # fixed prompt prefix (and provider prefix caching) for a shorter prompt.
+        self.schema_top_k = schema_top_k
+        schema_lines = self.schema_info.splitlines()
+        self._schema_header = [line for line in schema_lines if not line.startswith("- ")]
+        self._schema_columns = [line for line in schema_lines if line.startswith("- ")]
+        self._schema_vectors = None
+        if schema_top_k:
+            import numpy as np
+            column_vectors = np.asarray(
+                self.embeddings.embed_documents(self._schema_columns), dtype=np.float32
+            )
+            self._schema_vectors = column_vectors / np.linalg.norm(column_vectors, axis=1, keepdims=True)
+        
+        # Stable part of the prompt (role, schema, rules). It is sent as the
+        # leading prefix of every request so the provider can reuse it from
+        # its prompt cache; only the question varies between calls.
+        self.system_prompt = PromptTemplate(
+            input_variables=["schema"],
+            template=textwrap.dedent("""
+            You are a PostgreSQL expert. Given the following database schema and a natural language question,
             generate a valid PostgreSQL query. Return ONLY the SQL query without any explanation or formatting.
 
             Database Schema:
             {schema}
 
-            Question: {question}
-
             Rules:
             1. Use proper PostgreSQL syntax
             2. Use ILIKE for case-insensitive string matching
@@ -71,34 +168,146 @@ class TextToSQLGenerator:
             5. Use COUNT(*) for counting queries
             6. Use DISTINCT when needed to avoid duplicates
             7. Return only the SQL query, no explanation
+            """).strip()
+        )
+        
+        # Per-call part of the prompt
+        self.user_prompt = PromptTemplate(
+            input_variables=["question"],
+            template=textwrap.dedent("""
+            Question: {question}
 
             SQL Query:
-            """
+            """).strip()
         )
         
-        # Create the LLM chain
-        self.sql_chain = LLMChain(
-            llm=self.llm,
-            prompt=self.prompt_template
+        # Static content first, the question strictly last, with a fixed
+        # separator so the prefix is byte-identical across calls. The schema
+        # never changes, so it is substituted once here and only {question}
+        # is left to fill per call.
+        self._static_prompt = self.system_prompt.format(schema=self.schema_info)
+        self.prompt_template = PromptTemplate(
+            input_variables=["question"],
+            template=self._static_prompt + "\n\n" + self.user_prompt.template
         )
 
     def connect_db(self):
-        """Connect to PostgreSQL database"""
+        """Check out a database connection from the pool"""
         try:
-            self.conn = psycopg2.connect(**self.db_config)
-            self.cursor = self.conn.cursor()
+            if self._pool is None:
+                self._pool = ThreadedConnectionPool(0, 16, **self.db_config)
+            self.conn = self._pool.getconn()
+            # Generated SQL runs in read-only transactions: INSERT/UPDATE/DELETE
+            # (also inside a CTE) and SELECT ... FOR UPDATE fail on the server.
+            # Side-effecting functions are still callable, so the database role
+            # should only be granted SELECT.
+            self.conn.readonly = True
             print("✅ Connected to database successfully")
         except Exception as e:
             print(f"❌ Database connection error: {e}")
             raise
 
     def close_db(self):
-        """Close database connection"""
-        if self.cursor:
-            self.cursor.close()
+        """Return the database connection to the pool"""
         if self.conn:
-            self.conn.close()
+            broken = bool(self.conn.closed)
+            if not broken:
+                try:
+                    # Hand the connection back with its default session settings
+                    self.conn.rollback()
+                    self.conn.readonly = None
+                except psycopg2.Error:
+                    broken = True
+            # A broken connection is closed rather than handed out again
+            self._pool.putconn(self.conn, close=broken)
+            self.conn = None
         print("✅ Database connection closed")
+        if self.semantic_cache_path:
+            self._save_semantic_cache()
+
+    def close_pool(self):
+        """Close the private pool, if one was opened; an injected pool is left alone"""
+        if self._owns_pool and self._pool is not None:
+            self._pool.closeall()
+            self._pool = None
+
+    def __enter__(self):
+        self.connect_db()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close_db()
+        self.close_pool()
+
+    def _load_semantic_cache(self):
+        """Load cached questions, SQL and embeddings from disk"""
+        import numpy as np
+        vectors = np.load(f"{self.semantic_cache_path}.npy", allow_pickle=False)
+        with open(f"{self.semantic_cache_path}.json", encoding="utf-8") as f:
+            data = json.load(f)
+        count = min(len(data["queries"]), len(vectors), self._semantic_cache_size)
+        if count == 0:
+            return
+        self._cache_vectors = np.zeros(
+            (self._semantic_cache_size, vectors.shape[1]), dtype=np.float32
+        )
+        self._cache_vectors[:count] = vectors[:count]
+        self._cache_questions = data["questions"][:count]
+        self._cache_queries = data["queries"][:count]
+        self._cache_next = data.get("next", count) % self._semantic_cache_size
+
+    def _save_semantic_cache(self):
+        """Persist cached questions, SQL and embeddings to disk"""
+        import numpy as np
+        count = len(self._cache_queries)
+        if count == 0:
+            return
+        np.save(f"{self.semantic_cache_path}.npy", self._cache_vectors[:count], allow_pickle=False)
+        with open(f"{self.semantic_cache_path}.json", "w", encoding="utf-8") as f:
+            json.dump({
+                "questions": self._cache_questions,
+                "queries": self._cache_queries,
+                "next": self._cache_next
+            }, f)
+
+    def _embed_question(self, question: str) -> np.ndarray:
+        """Embed a question as a unit vector so dot product is cosine similarity"""
+        return self._unit_vector(self.embeddings.embed_query(question))
+
+    @staticmethod
+    def _unit_vector(embedding: List[float]) -> np.ndarray:
+        """Normalize an embedding to unit length"""
+        import numpy as np
+        vector = np.asarray(embedding, dtype=np.float32)
+        return vector / np.linalg.norm(vector)
+
+    def _semantic_lookup(self, vector: np.ndarray) -> Optional[str]:
+        """Return cached SQL for the most similar question above the threshold"""
+        count = len(self._cache_queries)
+        if count == 0:
+            return None
+        scores = self._cache_vectors[:count] @ vector
+        best = int(scores.argmax())
+        if scores[best] >= self.semantic_cache_threshold:
+            return self._cache_queries[best]
+        return None
+
+    def _semantic_store(self, question: str, vector: np.ndarray, sql_query: str):
+        """Add a generated query to the semantic cache, replacing the oldest when full"""
+        if self._cache_vectors is None:
+            import numpy as np
+            self._cache_vectors = np.zeros(
+                (self._semantic_cache_size, vector.shape[0]), dtype=np.float32
+            )
+        slot = self._cache_next
+        if slot == len(self._cache_queries):
+            self._cache_questions.append(question)
+            self._cache_queries.append(sql_query)
+        else:
+            self._cache_questions[slot] = question
+            self._cache_queries[slot] = sql_query
+        self._cache_vectors[slot] = vector
+        self._cache_next = (slot + 1) % self._semantic_cache_size
 
     def generate_sql_query(self, natural_language_question: str) -> str:
         """
@@ -111,38 +320,130 @@ class TextToSQLGenerator:
             Generated SQL query string
         """
         try:
-            result = self.sql_chain.run(
-                schema=self.schema_info,
-                question=natural_language_question
-            )
+            question = natural_language_question.strip()
+            
+            # Byte-identical repeat of an earlier question
+            cached_query = self._recall_query(question)
+            if cached_query:
+                return cached_query
+            
+            # Reuse SQL from a near-identical earlier question if we have one
+            vector = None
+            if self.embeddings is not None:
+                vector = self._embed_question(question)
+                cached_query = self._semantic_hit(question, vector)
+                if cached_query:
+                    return cached_query
+            
+            # Call the model directly; the prompt is plain string formatting
+            result = self.llm.invoke(self._build_prompt(question, vector))
             
             # Clean up the generated query
-            sql_query = self._clean_sql_query(result)
-            return sql_query
+            return self._store_generated(question, vector, result)
             
         except Exception as e:
             print(f"❌ Error generating SQL query: {e}")
             return None
 
-    def _clean_sql_query(self, raw_query: str) -> str:
-        """Clean and validate the generated SQL query"""
-        # Remove any markdown formatting or extra text
-        query = raw_query.strip()
-        
-        # Remove code blocks if present
-        if query.startswith("```"):
-            query = re.sub(r"```sql\n|```\n|```", "", query)
-        
-        # Remove any explanatory text before or after the query
-        lines = query.split('\n')
-        sql_lines = []
+    async def generate_sql_query_async(self, natural_language_question: str) -> str:
+        """
+        Async variant of generate_sql_query, so several questions can wait on
+        the LLM concurrently
         
-        for line in lines:
-            line = line.strip()
-            if line and not line.startswith('#') and not line.startswith('--'):
-                sql_lines.append(line)
+        Args:
+            natural_language_question: User's question in natural language
+            
+        Returns:
+            Generated SQL query string
+        """
+        try:
+            question = natural_language_question.strip()
+            
+            cached_query = self._recall_query(question)
+            if cached_query:
+                return cached_query
+            
+            vector = None
+            if self.embeddings is not None:
+                vector = self._unit_vector(await self.embeddings.aembed_query(question))
+                cached_query = self._semantic_hit(question, vector)
+                if cached_query:
+                    return cached_query
+            
+            result = await self.llm.ainvoke(self._build_prompt(question, vector))
+            
+            return self._store_generated(question, vector, result)
+            
+        except Exception as e:
+            print(f"❌ Error generating SQL query: {e}")
+            return None
+
+    def _build_prompt(self, question: str, vector: Optional[np.ndarray]) -> str:
+        """Render the prompt, with only the top-k relevant columns if enabled"""
+        if not self.schema_top_k:
+            return self.prompt_template.format(question=question)
         
-        query = ' '.join(sql_lines)
+        scores = self._schema_vectors @ vector
+        top = sorted((-scores).argsort()[:self.schema_top_k])
+        schema = "\n".join(self._schema_header + [self._schema_columns[i] for i in top])
+        return (
+            self.system_prompt.format(schema=schema)
+            + "\n\n"
+            + self.user_prompt.format(question=question)
+        )
+
+    def _recall_query(self, question: str) -> Optional[str]:
+        """Look up the exact-match cache, marking a hit as recently used"""
+        if question not in self._sql_cache:
+            return None
+        self._sql_cache.move_to_end(question)
+        return self._sql_cache[question]
+
+    def _semantic_hit(self, question: str, vector: np.ndarray) -> Optional[str]:
+        """Look up the semantic cache, promoting a hit into the exact-match cache"""
+        if self.semantic_cache_threshold is None:
+            return None
+        cached_query = self._semantic_lookup(vector)
+        if cached_query:
+            self._remember_query(question, cached_query)
+        return cached_query
+
+    def _store_generated(self, question: str, vector: Optional[np.ndarray], raw_result: str) -> str:
+        """Clean a fresh LLM result and cache it if it would be allowed to run"""
+        sql_query = self._clean_sql_query(raw_result)
+        # Never cache a generation the guard rejects; it would be replayed
+        # for every repeat of the question
+        if not _SQL_GUARD_RE.match(sql_query):
+            return sql_query
+        if vector is not None and self.semantic_cache_threshold is not None:
+            self._semantic_store(question, vector, sql_query)
+        self._remember_query(question, sql_query)
+        return sql_query
+
+    def _forget_query(self, sql_query: str):
+        """Drop a query that failed to execute from both caches"""
+        for question in [q for q, cached in self._sql_cache.items() if cached == sql_query]:
+            del self._sql_cache[question]
+        for slot, cached in enumerate(self._cache_queries):
+            if cached == sql_query:
+                self._cache_queries[slot] = None
+                # A zero vector scores 0 and can never match again
+                self._cache_vectors[slot] = 0
+
+    def _remember_query(self, question: str, sql_query: str):
+        """Insert into the exact-match cache, evicting the least recently used entry"""
+        self._sql_cache[question] = sql_query
+        self._sql_cache.move_to_end(question)
+        if len(self._sql_cache) > self._sql_cache_size:
+            self._sql_cache.popitem(last=False)
+
+    def _clean_sql_query(self, raw_query: str) -> str:
+        """Clean and validate the generated SQL query"""
+        # Remove code fences and comment lines, then join the remaining
+        # lines into a single line
+        query = _FENCE_RE.sub("", raw_query)
+        query = _COMMENT_RE.sub("", query)
+        query = _LINE_BREAK_RE.sub(" ", query).strip()
         
         # Ensure query ends with semicolon
         if not query.endswith(';'):
@@ -150,39 +451,72 @@ class TextToSQLGenerator:
             
         return query
 
-    def execute_query(self, sql_query: str) -> List[Dict[str, Any]]:
+    def iter_query(self, sql_query: str, batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """
+        Execute a SQL query and stream its rows from a server-side cursor
+        
+        Args:
+            sql_query: SQL query to execute
+            batch_size: Number of rows fetched per round trip
+            
+        Yields:
+            One dictionary per result row
+            
+        Raises:
+            ValueError: If the query does not look like a single SELECT/WITH statement
+        """
+        # Reject obviously wrong generations locally instead of paying a round
+        # trip for the server to fail on them
+        if not _SQL_GUARD_RE.match(sql_query):
+            raise ValueError(f"Refusing to run non-SELECT query: {sql_query}")
+        
+        if not self.conn:
+            self.connect_db()
+        
+        # A named cursor keeps the result set on the server, so memory stays
+        # bounded by batch_size however many rows the query returns
+        name = f"sql_stream_{uuid.uuid4().hex}"
+        with self.conn.cursor(name=name, cursor_factory=RealDictCursor) as cursor:
+            cursor.execute(sql_query)
+            while rows := cursor.fetchmany(batch_size):
+                yield from rows
+
+    def execute_query(self, sql_query: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Execute the generated SQL query and return results
         
         Args:
             sql_query: SQL query to execute
+            limit: Maximum number of rows to return; None returns every row
             
         Returns:
             List of dictionaries containing query results
         """
+        return self._run_query(sql_query, limit)[0]
+
+    def _run_query(self, sql_query: str, limit: Optional[int] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Execute a query, returning its rows and an error message on failure"""
         try:
-            if not self.conn:
-                self.connect_db()
-                
-            self.cursor.execute(sql_query)
-            
-            # Get column names
-            column_names = [desc[0] for desc in self.cursor.description]
-            
-            # Fetch all results
-            rows = self.cursor.fetchall()
-            
-            # Convert to list of dictionaries
-            results = []
-            for row in rows:
-                result_dict = dict(zip(column_names, row))
-                results.append(result_dict)
-                
-            return results
+            return list(itertools.islice(self.iter_query(sql_query), limit)), None
             
         except Exception as e:
             print(f"❌ Error executing query: {e}")
-            return []
+            self._recover_connection()
+            return [], str(e)
+
+    def _recover_connection(self):
+        """Roll back after a failed query, discarding the connection if it is broken"""
+        if not self.conn:
+            return
+        if not self.conn.closed:
+            try:
+                # Leave the connection usable for the next query
+                self.conn.rollback()
+                return
+            except psycopg2.Error as e:
+                print(f"❌ Discarding broken database connection: {e}")
+        self._pool.putconn(self.conn, close=True)
+        self.conn = None
 
     def query_from_text(self, natural_language_question: str) -> Dict[str, Any]:
         """
@@ -198,26 +532,89 @@ class TextToSQLGenerator:
         
         # Generate SQL query
         sql_query = self.generate_sql_query(natural_language_question)
-        
         if not sql_query:
-            return {
-                "question": natural_language_question,
-                "sql_query": None,
-                "results": [],
-                "error": "Failed to generate SQL query"
-            }
+            return self._failed_result(natural_language_question)
         
         print(f"📝 Generated SQL: {sql_query}")
         
         # Execute query
-        results = self.execute_query(sql_query)
+        results, error = self._run_query(sql_query)
+        return self._build_result(natural_language_question, sql_query, results, error)
+
+    async def query_from_text_async(self, natural_language_question: str) -> Dict[str, Any]:
+        """
+        Async variant of query_from_text; the LLM call is awaited and the
+        query runs in a worker thread so the event loop is never blocked
+        
+        Args:
+            natural_language_question: User's question in natural language
+            
+        Returns:
+            Dictionary containing SQL query, results, and metadata
+        """
+        print(f"🔍 Processing question: {natural_language_question}")
+        
+        sql_query = await self.generate_sql_query_async(natural_language_question)
+        if not sql_query:
+            return self._failed_result(natural_language_question)
+        
+        print(f"📝 Generated SQL: {sql_query}")
+        
+        # The instance has a single connection, so queries take turns
+        async with self._get_db_lock():
+            results, error = await asyncio.to_thread(self._run_query, sql_query)
+        return self._build_result(natural_language_question, sql_query, results, error)
+
+    def _get_db_lock(self) -> asyncio.Lock:
+        """Return the query lock for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._db_lock is None or self._db_lock_loop is not loop:
+            self._db_lock = asyncio.Lock()
+            self._db_lock_loop = loop
+        return self._db_lock
+
+    async def query_many_async(self, questions: List[str]) -> List[Dict[str, Any]]:
+        """
+        Answer several questions with their LLM calls in flight concurrently
+        
+        Args:
+            questions: User questions in natural language
+            
+        Returns:
+            One result dictionary per question, in the same order
+        """
+        return await asyncio.gather(
+            *(self.query_from_text_async(question) for question in questions)
+        )
+
+    def _failed_result(self, natural_language_question: str) -> Dict[str, Any]:
+        """Result for a question no SQL could be generated for"""
+        return {
+            "question": natural_language_question,
+            "sql_query": None,
+            "results": [],
+            "num_results": 0,
+            "error": "Failed to generate SQL query"
+        }
+
+    def _build_result(
+        self,
+        natural_language_question: str,
+        sql_query: str,
+        results: List[Dict[str, Any]],
+        error: Optional[str]
+    ) -> Dict[str, Any]:
+        """Package an executed query with its metadata"""
+        # A query that fails is not worth replaying from cache
+        if error:
+            self._forget_query(sql_query)
         
         return {
             "question": natural_language_question,
             "sql_query": sql_query,
             "results": results,
             "num_results": len(results),
-            "error": None
+            "error": error
         }
 
     def get_sample_questions(self) -> List[str]:
@@ -264,9 +661,10 @@ if __name__ == "__main__":
         print("🚀 Testing Text-to-SQL Generation:")
         print("=" * 50)
         
-        for question in sample_questions:
-            result = text_to_sql.query_from_text(question)
-            
+        # Generate SQL for all questions concurrently
+        results = asyncio.run(text_to_sql.query_many_async(sample_questions))
+        
+        for result in results:
             print(f"\n📋 Question: {result['question']}")
             print(f"🔧 SQL Query: {result['sql_query']}")
             print(f"📊 Number of results: {result['num_results']}")
@@ -289,4 +687,5 @@ if __name__ == "__main__":
     
     finally:
         text_to_sql.close_db()
+        text_to_sql.close_pool()
         